@@ -1,15 +1,24 @@
 # @Author:慕白
+import base64
+import io
 import json
 import os
 import random
+import re
+import threading
 import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Union, Tuple
+from typing import Union, Tuple, Callable
 import cv2
 import numpy as np
+import psutil
 from PIL import Image
 from ddddocr import DdddOcr
-from selenium.common import NoSuchElementException
+from selenium.common import NoSuchElementException, WebDriverException, StaleElementReferenceException, \
+    NoSuchFrameException
 from selenium.webdriver import Chrome, ActionChains
 from selenium.webdriver import ChromeOptions
 from selenium.webdriver.chrome.service import Service
@@ -27,17 +36,90 @@ class OpenError(Exception):
     ...
 
 
+# 识别模型缓存,每个进程只加载一次
+_ocr_cache = {}
+_ocr_lock = threading.Lock()
+
+
+def _get_ocr(**kwargs):
+    """
+    获取识别模型
+    """
+    key = tuple(sorted(kwargs.items()))
+    with _ocr_lock:
+        if key not in _ocr_cache:
+            _ocr_cache[key] = DdddOcr(show_ad=False, **kwargs)
+        return _ocr_cache[key]
+
+
+def _solve_security_code(image: bytes):
+    """
+    识别验证码
+    """
+    return _get_ocr(old=True).classification(image)
+
+
+def _solve_slider_distance(slider: bytes, background: bytes):
+    """
+    识别滑块距离
+    """
+    result = _get_ocr(det=False, ocr=False).slide_match(slider, background, simple_target=True)
+    return result['target'][0]
+
+
+def _solve_slider_distance1(slider: bytes, background: bytes):
+    """
+    模板匹配识别滑块距离
+    """
+    slider_pic = cv2.imdecode(np.frombuffer(slider, np.uint8), cv2.IMREAD_GRAYSCALE)
+    background_pic = cv2.imdecode(np.frombuffer(background, np.uint8), cv2.IMREAD_GRAYSCALE)
+    background_pic = abs(255 - background_pic)
+    result = cv2.matchTemplate(background_pic, slider_pic, cv2.TM_CCOEFF_NORMED)
+    top, left = np.unravel_index(result.argmax(), result.shape)
+    return int(left)
+
+
 class BasePage:
     """
     Selenium封装
     """
+    # 验证码识别执行器,所有实例及子类共用,只通过BasePage读写
+    _solver = None
+    _solver_lock = threading.RLock()
 
-    def __init__(self, display: bool = True):
+    def __init__(self, display: bool = True, capture: bool = False):
         """
         驱动谷歌浏览器
+        capture:开启性能日志,用于捕获接口响应
         """
         if not isinstance(display, bool):
             raise TypeError('display must be a boolean')
+        if not isinstance(capture, bool):
+            raise TypeError('capture must be a boolean')
+        self.display = display
+        self.capture = capture
+        # 隐式等待时间,重启浏览器后恢复
+        self.implicit_wait = 0
+        self._start_driver()
+        # 需要捕获的接口
+        self.capture_patterns = []
+        # requestId -> 已收到响应头的接口,跨多次读取保留,避免日志被清空后丢失
+        self._pending_responses = {}
+        # 当前所在的frame路径,以及frame元素缓存(页面跳转后失效)
+        self.frame_path = []
+        self._frame_cache = {}
+        # frame切换次数统计,skipped为复用当前frame而省去的切换次数
+        self.frame_switches = {'frame': 0, 'parent': 0, 'main': 0, 'skipped': 0}
+        # 内存上限(MB),内存记录及回收记录
+        self.memory_limit = {'js_heap': None, 'process': None, 'interval': 30}
+        self.memory_records = deque(maxlen=1000)
+        self.recycle_records = []
+        self._memory_checked = 0
+
+    def _start_driver(self):
+        """
+        启动谷歌浏览器
+        """
         options = ChromeOptions()
         # 开发者模式
         options.add_experimental_option('excludeSwitches', ['enable-automation'])
@@ -53,7 +135,10 @@ class BasePage:
         options.add_experimental_option('prefs', prefs)
         # 跳过安全证书验证
         options.set_capability('acceptInsecureCerts', True)
-        if display:
+        if self.capture:
+            # 开启性能日志,用于捕获接口响应
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        if self.display:
             # 结束后保留浏览器页面
             options.add_experimental_option('detach', True)
             self.driver = Chrome(options=options, service=Service(ChromeDriverManager().install()))
@@ -70,6 +155,8 @@ class BasePage:
                                       """
         })
         self.driver.maximize_window()
+        # 开启性能指标,用于获取js内存
+        self.driver.execute_cdp_cmd('Performance.enable', {})
 
     def open(self, url: str):
         """
@@ -77,6 +164,9 @@ class BasePage:
         """
         if not isinstance(url, str):
             raise TypeError(f'{url} must be a string')
+        # 马上要打开新网页,重启浏览器时不需要恢复当前网页
+        self.check_memory(restore=False)
+        self._reset_frame()
         try:
             self.driver.get(url)
         except Exception:
@@ -103,7 +193,7 @@ class BasePage:
                     if "domain" in cookie.keys():
                         cookie.pop("domain")
                 self.driver.add_cookie(cookie)
-        self.driver.refresh()
+        self.refresh()
 
     def wait(self, times: Union[int, float]):
         """
@@ -111,6 +201,7 @@ class BasePage:
         """
         if not isinstance(times, (int, float)):
             raise TypeError(f'{times} must be an integer or a float')
+        self.implicit_wait = times
         self.driver.implicitly_wait(times)
 
     def wait_element(self, element: Tuple[str, str]):
@@ -209,6 +300,151 @@ class BasePage:
         """
         return self.driver.page_source
 
+    def add_capture(self, pattern: str):
+        """
+        添加需要捕获的接口(正则匹配url),需在打开网页前添加,之前的性能日志会被清空
+        """
+        if not isinstance(pattern, str):
+            raise TypeError(f'{pattern} must be a string')
+        self._check_capture()
+        # 清空之前的性能日志,只捕获之后的请求
+        self.driver.get_log('performance')
+        self.capture_patterns.append(re.compile(pattern))
+
+    def _check_capture(self):
+        """
+        检查是否开启了性能日志
+        """
+        if not self.capture:
+            raise ValueError('capture is disabled, create BasePage with capture=True')
+
+    def remove_capture(self, pattern: str = None):
+        """
+        移除捕获的接口,不传则全部移除
+        """
+        if pattern is None:
+            self.capture_patterns.clear()
+            return
+        if not isinstance(pattern, str):
+            raise TypeError(f'{pattern} must be a string')
+        self.capture_patterns = [p for p in self.capture_patterns if p.pattern != pattern]
+
+    def iter_responses(self, timeout: Union[int, float] = 10, max_size: int = 1024 * 1024):
+        """
+        逐个获取捕获的接口响应,超过timeout秒没有新的响应则结束
+        返回值:{'url': url, 'status': 状态码, 'mime_type': 类型, 'body': 响应内容, 'truncated': 是否被截断}
+        """
+        self._check_response_args(timeout, max_size)
+        if not self.capture_patterns:
+            raise ValueError('no capture pattern, call add_capture first')
+        return self._iter_responses(list(self.capture_patterns), timeout, max_size)
+
+    def _check_response_args(self, timeout: Union[int, float], max_size: int):
+        """
+        检查读取接口响应的参数
+        """
+        if not isinstance(timeout, (int, float)):
+            raise TypeError(f'{timeout} must be an integer or a float')
+        if not isinstance(max_size, int):
+            raise TypeError(f'{max_size} must be an integer')
+        self._check_capture()
+
+    def _iter_responses(self, patterns: list, timeout: Union[int, float], max_size: int):
+        """
+        从性能日志中读取匹配patterns的接口响应,读取过的日志会被清空
+        未加载完成或未被取走的接口保留在_pending_responses中,供之后读取
+        """
+        pending = self._pending_responses
+        deadline = time.time() + timeout
+        while True:
+            # 返回已加载完成的接口,未被取走的继续保留
+            ready = [k for k, v in pending.items() if v['finished'] and any(p.search(v['url']) for p in patterns)]
+            for request_id in ready:
+                if request_id in pending:
+                    yield self._pop_response(request_id, max_size)
+                    deadline = time.time() + timeout
+            if time.time() >= deadline:
+                break
+            self.stop(0.2)
+            for entry in self.driver.get_log('performance'):
+                message = json.loads(entry['message'])['message']
+                method = message.get('method')
+                params = message.get('params', {})
+                request_id = params.get('requestId')
+                if method == 'Network.responseReceived':
+                    response = params['response']
+                    if any(p.search(response['url']) for p in patterns + self.capture_patterns):
+                        pending[request_id] = {
+                            'url': response['url'],
+                            'status': response['status'],
+                            'mime_type': response.get('mimeType', ''),
+                            'size': 0,
+                            'finished': False
+                        }
+                        # 只保留最近的接口,避免一直不读取时无限增长
+                        while len(pending) > 100:
+                            pending.pop(next(iter(pending)))
+                elif method == 'Network.dataReceived' and request_id in pending:
+                    # 解压后的响应大小
+                    pending[request_id]['size'] += params.get('dataLength', 0)
+                elif method == 'Network.loadingFinished' and request_id in pending:
+                    pending[request_id]['finished'] = True
+                elif method == 'Network.loadingFailed':
+                    pending.pop(request_id, None)
+
+    def _pop_response(self, request_id: str, max_size: int):
+        """
+        取出已加载完成的接口并读取响应内容
+        """
+        info = self._pending_responses.pop(request_id)
+        body, truncated = self._get_response_body(request_id, info['size'], max_size)
+        return {'url': info['url'], 'status': info['status'], 'mime_type': info['mime_type'],
+                'body': body, 'truncated': truncated}
+
+    def _get_response_body(self, request_id: str, length: int, max_size: int):
+        """
+        读取接口响应内容,超过max_size(字节)则不读取
+        """
+        if length > max_size:
+            return None, True
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except WebDriverException:
+            # 响应内容已被浏览器释放
+            return None, False
+        body = result['body']
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body)
+            if len(body) > max_size:
+                return body[:max_size], True
+            return body, False
+        data = body.encode()
+        if len(data) > max_size:
+            return data[:max_size].decode(errors='ignore'), True
+        return body, False
+
+    def listen_responses(self, callback: Callable, timeout: Union[int, float] = 10, max_size: int = 1024 * 1024):
+        """
+        监听捕获的接口响应,每获取一个响应调用一次callback
+        """
+        if not callable(callback):
+            raise TypeError(f'{callback} must be callable')
+        for item in self.iter_responses(timeout, max_size):
+            callback(item)
+
+    def get_response_json(self, pattern: str, timeout: Union[int, float] = 10, max_size: int = 1024 * 1024):
+        """
+        获取第一个匹配接口的json数据
+        注意:会读取并清空性能日志,期间匹配add_capture的接口会保留,之后仍可通过iter_responses获取
+        """
+        if not isinstance(pattern, str):
+            raise TypeError(f'{pattern} must be a string')
+        self._check_response_args(timeout, max_size)
+        for item in self._iter_responses([re.compile(pattern)], timeout, max_size):
+            if item['body'] is not None and not item['truncated']:
+                return json.loads(item['body'])
+        return None
+
     def get_title(self):
         """
         获取标题
@@ -231,34 +467,127 @@ class BasePage:
         """
         切换到上一个页面
         """
+        self._reset_frame()
         self.driver.back()
+        self.check_memory()
 
     def switch_to_next_page(self):
         """
         切换到下一个页面
         """
+        self._reset_frame()
         self.driver.forward()
+        self.check_memory()
 
     def switch_to_frame(self, frame: Union[int, tuple]):
         """
         切换到frame弹窗
         """
-        if type(frame) is int:
-            self.driver.switch_to.frame(frame)
-            return
-        self.driver.switch_to.frame(self.position(frame))
+        if not isinstance(frame, (int, tuple)):
+            raise TypeError(f'{frame} must be an integer or a (string,string)')
+        self._enter_frame(frame)
 
     def switch_to_forward_frame(self):
         """
         切换到上一个frame弹窗
         """
         self.driver.switch_to.parent_frame()
+        self.frame_switches['parent'] += 1
+        if self.frame_path:
+            self.frame_path.pop()
 
     def switch_to_main_page(self):
         """
         切换到主页面
         """
         self.driver.switch_to.default_content()
+        self.frame_switches['main'] += 1
+        self.frame_path.clear()
+
+    @contextmanager
+    def frame(self, path: Union[int, Tuple[str, str], list]):
+        """
+        进入frame弹窗,退出时恢复到进入前的frame
+        path:frame下标/定位元组,嵌套frame传入由它们组成的列表,从主页面开始
+        用法:with page.frame([(By.ID, 'login'), (By.ID, 'captcha')]):
+        """
+        if isinstance(path, int) or (isinstance(path, tuple) and len(path) == 2 and all(isinstance(i, str) for i in path)):
+            path = [path]
+        if not isinstance(path, (list, tuple)):
+            raise TypeError(f'{path} must be an integer, a (string,string) or a list of them')
+        previous = list(self.frame_path)
+        try:
+            self._switch_frame_path(list(path))
+            yield self
+        finally:
+            try:
+                self._switch_frame_path(previous)
+            except WebDriverException:
+                # 原frame已失效(如页面已跳转),回到主页面
+                self._reset_frame()
+                self.switch_to_main_page()
+
+    def _switch_frame_path(self, path: list):
+        """
+        切换到指定frame路径,只切换与当前路径不同的部分
+        """
+        common = 0
+        for current, frame in zip(self.frame_path, path):
+            if current != frame:
+                break
+            common += 1
+        if common > 0 and self._frame_depth() != len(self.frame_path):
+            # 记录的frame路径已失效(如frame内触发了页面跳转),从主页面重新进入
+            self._reset_frame()
+            self.switch_to_main_page()
+            common = 0
+        self.frame_switches['skipped'] += common
+        up = len(self.frame_path) - common
+        if common == 0 and up > 0:
+            self.switch_to_main_page()
+        else:
+            for _ in range(up):
+                self.switch_to_forward_frame()
+        for frame in path[common:]:
+            self._enter_frame(frame)
+
+    def _frame_depth(self):
+        """
+        获取浏览器当前所在frame的层数,获取失败返回-1
+        """
+        js = 'let depth = 0, win = window; while (win !== win.parent) {depth++; win = win.parent;} return depth'
+        try:
+            return self.execute_js(js)
+        except WebDriverException:
+            return -1
+
+    def _enter_frame(self, frame: Union[int, Tuple[str, str]]):
+        """
+        从当前frame进入子frame,优先使用缓存的frame元素
+        """
+        if type(frame) is int:
+            self.driver.switch_to.frame(frame)
+        else:
+            key = tuple(self.frame_path) + (frame,)
+            element = self._frame_cache.get(key)
+            if element is not None:
+                try:
+                    self.driver.switch_to.frame(element)
+                except (StaleElementReferenceException, NoSuchFrameException):
+                    element = None
+            if element is None:
+                element = self.position(frame)
+                self.driver.switch_to.frame(element)
+                self._frame_cache[key] = element
+        self.frame_switches['frame'] += 1
+        self.frame_path.append(frame)
+
+    def _reset_frame(self):
+        """
+        页面跳转后回到主页面,清空frame缓存
+        """
+        self.frame_path.clear()
+        self._frame_cache.clear()
 
     def switch_page(self, index: int):
         """
@@ -270,7 +599,9 @@ class BasePage:
         if index < -len(handles) - 1 or index > len(handles):
             raise ValueError(f'{index} must be between -{len(handles) - 1} '
                              f'and -1 or between 0 and {len(handles)}')
+        self._reset_frame()
         self.driver.switch_to.window(handles[index])
+        self.check_memory()
 
     def switch_to_alert(self):
         """
@@ -311,6 +642,110 @@ class BasePage:
         """
         self.driver.quit()
 
+    def set_memory_limit(self, js_heap: Union[int, float] = None, process: Union[int, float] = None,
+                         interval: Union[int, float] = 30):
+        """
+        设置内存上限(MB),打开网页时每隔interval秒检查一次,超过上限自动回收浏览器
+        js_heap:页面js堆内存上限,process:浏览器进程内存上限,传None不限制
+        """
+        for value in (js_heap, process):
+            if value is not None and not isinstance(value, (int, float)):
+                raise TypeError(f'{value} must be an integer or a float')
+        if not isinstance(interval, (int, float)):
+            raise TypeError(f'{interval} must be an integer or a float')
+        self.memory_limit = {'js_heap': js_heap, 'process': process, 'interval': interval}
+
+    def get_memory(self):
+        """
+        获取浏览器内存(MB)并记录
+        返回值:{'time': 时间戳, 'js_heap': js堆内存, 'process': 浏览器进程内存}
+        """
+        # 切换页面后需要对当前页面重新开启性能指标
+        self.driver.execute_cdp_cmd('Performance.enable', {})
+        metrics = self.driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']
+        js_heap = next((m['value'] for m in metrics if m['name'] == 'JSHeapUsedSize'), 0)
+        process = 0
+        try:
+            driver_process = psutil.Process(self.driver.service.process.pid)
+            for child in driver_process.children(recursive=True):
+                try:
+                    process += child.memory_info().rss
+                except psutil.Error:
+                    continue
+        except psutil.Error:
+            pass
+        memory = {'time': time.time(), 'js_heap': js_heap / 1024 / 1024, 'process': process / 1024 / 1024}
+        self.memory_records.append(memory)
+        return memory
+
+    def _over_memory_limit(self, memory: dict):
+        """
+        判断内存是否超过上限
+        """
+        return any(self.memory_limit[key] is not None and memory[key] > self.memory_limit[key]
+                   for key in ('js_heap', 'process'))
+
+    def check_memory(self, force: bool = False, restore: bool = True):
+        """
+        检查内存,超过上限则回收浏览器,返回是否重启了浏览器
+        open/refresh/switch_page/switch_to_front_page/switch_to_next_page时会自动检查,
+        停留在同一页面或通过点击跳转时需要自行调用
+        force:忽略检查间隔
+        restore:重启浏览器后是否恢复当前网页
+        """
+        if self.memory_limit['js_heap'] is None and self.memory_limit['process'] is None:
+            return False
+        if not force and time.time() - self._memory_checked < self.memory_limit['interval']:
+            return False
+        self._memory_checked = time.time()
+        if not self._over_memory_limit(self.get_memory()):
+            return False
+        return self.recycle(restore=restore)
+
+    def recycle(self, restart: bool = False, restore: bool = True):
+        """
+        回收浏览器内存:先关闭其他页面,仍超过上限则重启浏览器并恢复cookie和当前网页,返回是否重启了浏览器
+        restart:直接重启浏览器
+        restore:重启浏览器后是否恢复当前网页
+        """
+        if not restart and self.get_pages() > 1:
+            current = self.driver.current_window_handle
+            for handle in self.driver.window_handles:
+                if handle != current:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+            self.driver.switch_to.window(current)
+            self._reset_frame()
+            # 关闭的页面进程不会立即退出,等待一段时间再判断
+            for _ in range(10):
+                memory = self.get_memory()
+                if not self._over_memory_limit(memory):
+                    break
+                self.stop(0.5)
+            self.recycle_records.append({'time': memory['time'], 'action': 'close_pages', 'memory': memory})
+            if not self._over_memory_limit(memory):
+                return False
+        url = self.driver.current_url
+        # 获取所有域名的cookie
+        cookies = self.driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+        self.driver.quit()
+        self._start_driver()
+        self._reset_frame()
+        self.driver.implicitly_wait(self.implicit_wait)
+        keys = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires', 'priority')
+        cookies = [{key: cookie[key] for key in keys if key in cookie} for cookie in cookies]
+        for cookie in cookies:
+            # 会话cookie不设置过期时间
+            if cookie.get('expires', -1) < 0:
+                cookie.pop('expires', None)
+        if cookies:
+            self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+        if restore and url.startswith('http'):
+            self.driver.get(url)
+        memory = self.get_memory()
+        self.recycle_records.append({'time': memory['time'], 'action': 'restart', 'memory': memory})
+        return True
+
     def if_exist(self, element: Tuple[str, str]):
         """
         判断元素是否存在
@@ -345,13 +780,15 @@ class BasePage:
         """
         return self.position(element).is_selected()
 
-    def click_frame(self, frame: Tuple[str, str]):
+    def click_frame(self, frame: Tuple[str, str], timeout: Union[int, float] = 1000):
         """
         点击frame弹窗
         """
         if not isinstance(frame, Tuple):
             raise TypeError(f'{frame} must be a (string,string)')
-        WebDriverWait(self.driver, 1000).until(
+        if not isinstance(timeout, (int, float)):
+            raise TypeError(f'{timeout} must be an integer or a float')
+        WebDriverWait(self.driver, timeout).until(
             expected_conditions.element_to_be_clickable
             (frame)).click()
 
@@ -375,9 +812,8 @@ class BasePage:
         page_img = Image.open('./images/page.png')
         security_code_img = page_img.crop(val)
         security_code_img.save('./images/security_code.png')
-        ocr = DdddOcr(old=True, show_ad=False)
         with open('./images/security_code.png', 'rb') as f:
-            security_code = ocr.classification(f.read())
+            security_code = _solve_security_code(f.read())
         return security_code
 
     def get_slider_distance(self, slider: Tuple[str, str], background: Tuple[str, str], dpi: float = 1.5):
@@ -414,10 +850,7 @@ class BasePage:
             slider_img_bytes = f.read()
         with open('./images/bg.png', 'rb') as f:
             bg_img_bytes = f.read()
-        ocr = DdddOcr(det=False, ocr=False, show_ad=False)
-        result = ocr.slide_match(slider_img_bytes, bg_img_bytes, simple_target=True)
-        distance = result['target'][0]
-        return distance
+        return _solve_slider_distance(slider_img_bytes, bg_img_bytes)
 
     def get_slider_distance1(self, slider: Tuple[str, str], background: Tuple[str, str], dpi: float = 1.5):
         """
@@ -449,20 +882,87 @@ class BasePage:
         slider_img.save('./images/slider.png')
         bg_img = page_img.crop(bg_val)
         bg_img.save('./images/bg.png')
-        slider_pic = cv2.imread('./images/slider.png', 0)
-        background_pic = cv2.imread('./images/bg.png', 0)
-        cv2.imwrite('./images/slider_grey.png', background_pic)
-        cv2.imwrite('./images/bg_grey.png', slider_pic)
-        slider_pic = cv2.imread('./images/slider_grey.png')
-        slider_pic = cv2.cvtColor(slider_pic, cv2.COLOR_BGR2GRAY)
-        slider_pic = abs(255 - slider_pic)
-        cv2.imwrite('./images/slider_grey.png', slider_pic)
-        slider_pic = cv2.imread('./images/slider_grey.png')
-        background_pic = cv2.imread('./images/bg_grey.png')
-        result = cv2.matchTemplate(slider_pic, background_pic, cv2.TM_CCOEFF_NORMED)
-        top, left = np.unravel_index(result.argmax(), result.shape)
-        left = int(left)
-        return left
+        with open('./images/slider.png', 'rb') as f:
+            slider_img_bytes = f.read()
+        with open('./images/bg.png', 'rb') as f:
+            bg_img_bytes = f.read()
+        return _solve_slider_distance1(slider_img_bytes, bg_img_bytes)
+
+    @staticmethod
+    def set_solver(max_workers: int = None, process: bool = False):
+        """
+        设置验证码识别执行器,所有实例共用
+        process:True使用进程池(windows下需在if __name__ == '__main__'中运行),False使用线程池
+        """
+        if max_workers is not None and not isinstance(max_workers, int):
+            raise TypeError(f'{max_workers} must be an integer')
+        if not isinstance(process, bool):
+            raise TypeError(f'{process} must be a boolean')
+        with BasePage._solver_lock:
+            BasePage.shutdown_solver(wait=False)
+            BasePage._solver = ProcessPoolExecutor(max_workers) if process else ThreadPoolExecutor(max_workers)
+
+    @staticmethod
+    def shutdown_solver(wait: bool = True):
+        """
+        关闭验证码识别执行器
+        """
+        with BasePage._solver_lock:
+            solver, BasePage._solver = BasePage._solver, None
+        if solver is not None:
+            solver.shutdown(wait=wait)
+
+    @staticmethod
+    def _get_solver() -> Executor:
+        """
+        获取验证码识别执行器,未设置则创建线程池
+        """
+        with BasePage._solver_lock:
+            if BasePage._solver is None:
+                BasePage.set_solver()
+            return BasePage._solver
+
+    def _capture_elements(self, *elements: Tuple[str, str], dpi: float = 1.5):
+        """
+        截取元素图片,返回png字节
+        """
+        if not isinstance(dpi, float):
+            raise TypeError(f'{dpi} must be a float')
+        page_img = Image.open(io.BytesIO(self.driver.get_screenshot_as_png()))
+        images = []
+        for element in elements:
+            web_element = self.position(element)
+            loc = web_element.location
+            size = web_element.size
+            val = (loc['x'] * dpi, loc['y'] * dpi,
+                   loc['x'] * dpi + size['width'] * dpi, loc['y'] * dpi + size['height'] * dpi)
+            buffer = io.BytesIO()
+            page_img.crop(val).save(buffer, format='PNG')
+            images.append(buffer.getvalue())
+        return images
+
+    def submit_security_code(self, element: Tuple[str, str], dpi: float = 1.5) -> Future:
+        """
+        后台识别验证码,返回Future,通过result()获取验证码
+        """
+        image, = self._capture_elements(element, dpi=dpi)
+        return self._get_solver().submit(_solve_security_code, image)
+
+    def submit_slider_distance(self, slider: Tuple[str, str], background: Tuple[str, str],
+                               dpi: float = 1.5) -> Future:
+        """
+        后台识别滑块距离,返回Future,通过result()获取距离
+        """
+        slider_img, bg_img = self._capture_elements(slider, background, dpi=dpi)
+        return self._get_solver().submit(_solve_slider_distance, slider_img, bg_img)
+
+    def submit_slider_distance1(self, slider: Tuple[str, str], background: Tuple[str, str],
+                                dpi: float = 1.5) -> Future:
+        """
+        后台模板匹配识别滑块距离,返回Future,通过result()获取距离
+        """
+        slider_img, bg_img = self._capture_elements(slider, background, dpi=dpi)
+        return self._get_solver().submit(_solve_slider_distance1, slider_img, bg_img)
 
     def get_cookie(self):
         """
@@ -599,7 +1099,10 @@ class BasePage:
         """
         刷新网页
         """
-        self.driver.refresh()
+        self._reset_frame()
+        # 重启浏览器时已重新加载当前网页,不需要再刷新
+        if not self.check_memory():
+            self.driver.refresh()
 
     def save_screenshot(self, file: Union[str, Path]):
         """